@@ -1,21 +1,76 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
+import logging
 import re
 import os
-from typing import List, Optional, Union, IO
-
-import pymarc
-from pymarc import Field, Record
+import sys
+from typing import (
+    AbstractSet,
+    Any,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    IO,
+)
+
+from lxml import etree
 
 from marc_to_readable.utils import reverse_name
 
 
+logger = logging.getLogger(__name__)
+
+MARC_NAMESPACE = "http://www.loc.gov/MARC21/slim"
+# Matches <record> in the MARC21 slim namespace as well as un-namespaced MARCXML
+RECORD_TAG = "{*}record"
+CONTROLFIELD_TAG = f"{{{MARC_NAMESPACE}}}controlfield"
+DATAFIELD_TAG = f"{{{MARC_NAMESPACE}}}datafield"
+SUBFIELD_TAG = f"{{{MARC_NAMESPACE}}}subfield"
+# Record tag -> (controlfield, datafield, subfield) tags of its children. Other
+# namespaces are derived and added on first sight by _field_tags
+FIELD_TAGS: Dict[str, Tuple[str, str, str]] = {
+    f"{{{MARC_NAMESPACE}}}record": (CONTROLFIELD_TAG, DATAFIELD_TAG, SUBFIELD_TAG),
+    "record": ("controlfield", "datafield", "subfield"),
+}
+# MARC tags read by marcxml_to_readable, by default everything else is skipped
+# while parsing
+USED_TAGS = frozenset(
+    {"001", "008", "020", "041", "100", "245", "250", "260", "300", "490", "655", "700"}
+)
+
 NUMBER_REGEX = re.compile(r"\d+", re.IGNORECASE)
-SQUARE_BRACKETS_REGEX = re.compile(r"\[(.*?)\]")
-WHITESPACE_REGEX = re.compile(r"\s+")
 YEAR_REGEX = re.compile(r"\d{4}")
-
-
-@dataclass
+# Punctuation trimmed from both ends of cleaned subfield values
+STRIP_CHARS = ";:,./[] "
+
+# Field 700 relator term -> ReadableRecord list attribute
+ROLE_TO_ATTR = {
+    "autor": "authors",
+    "toimetaja": "editors",
+    "väljaandja": "publishers",
+    "koostaja": "compilers",
+    "illustreerija": "illustrators",
+    "tõlkija": "translators",
+    "kujundaja": "designers",
+    "fotograaf": "photographers",
+}
+
+# (ind1, ind2, {subfield code: [values]})
+DataField = Tuple[str, str, Dict[str, List[str]]]
+# Tag -> control field values or data fields, in document order. Built in a
+# single pass by _parse_record so every tag lookup afterwards is a dict lookup
+MarcRecord = Dict[str, list]
+
+# dataclass(slots=True) is only supported from Python 3.10 onwards
+DATACLASS_KWARGS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**DATACLASS_KWARGS)
 class ReadableRecord:
     ester_id: str
     title: str = ""
@@ -44,165 +99,306 @@ class ReadableRecord:
     photographers: List[str] = field(default_factory=list)  # fotograafid
 
 
-def get_stripped_subfield(field: "Field", subfield_code: str) -> str:
-    value = field.get(subfield_code)
-    if value:
-        cleaned_value = value.strip()
-        # Extract content inside square brackets and replace brackets with spaces
-        cleaned_value = SQUARE_BRACKETS_REGEX.sub(r"\1", cleaned_value)
-        # Replace multiple spaces with a single space
-        cleaned_value = WHITESPACE_REGEX.sub(" ", cleaned_value)
-        # Strip any remaining unwanted characters
-        return cleaned_value.strip().strip(";:,./[] ")
+def _iter_record_elements(src: Union[str, os.PathLike, IO[bytes]]) -> Iterator[Any]:
+    if isinstance(src, os.PathLike):
+        src = os.fspath(src)
+
+    for _, elem in etree.iterparse(src, events=("end",), tag=RECORD_TAG):
+        yield elem
+
+        # Release the parsed record and any siblings kept alive by the tree
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def _field_tags(record_tag: str) -> Tuple[str, str, str]:
+    field_tags = FIELD_TAGS.get(record_tag)
+    if field_tags is None:
+        # Fields use the same namespace as their record
+        namespace = record_tag[: -len("record")]
+        field_tags = FIELD_TAGS[record_tag] = (
+            namespace + "controlfield",
+            namespace + "datafield",
+            namespace + "subfield",
+        )
+    return field_tags
+
+
+def _parse_record(
+    elem: Any, tags: Optional[AbstractSet[str]] = USED_TAGS
+) -> MarcRecord:
+    controlfield_tag, datafield_tag, subfield_tag = _field_tags(elem.tag)
+
+    record: MarcRecord = {}
+    for child in elem:
+        child_tag = child.tag
+        if child_tag == datafield_tag:
+            tag = child.get("tag")
+            if tags is None or tag in tags:
+                subfields: Dict[str, List[str]] = {}
+                for subfield in child:
+                    if subfield.tag == subfield_tag:
+                        subfields.setdefault(subfield.get("code"), []).append(
+                            subfield.text or ""
+                        )
+                record.setdefault(tag, []).append(
+                    (child.get("ind1", " "), child.get("ind2", " "), subfields)
+                )
+        elif child_tag == controlfield_tag:
+            tag = child.get("tag")
+            if tags is None or tag in tags:
+                record.setdefault(tag, []).append(child.text or "")
+    return record
+
+
+def iter_marc_records(
+    src: Union[str, os.PathLike, IO[bytes]],
+    tags: Optional[AbstractSet[str]] = USED_TAGS,
+) -> Iterator[MarcRecord]:
+    # Pass tags=None to keep every field of the record
+    for elem in _iter_record_elements(src):
+        yield _parse_record(elem, tags)
+
+
+def _iter_record_batches(
+    src: Union[str, os.PathLike, IO[bytes]], batch_size: int
+) -> Iterator[List[bytes]]:
+    batch = []
+    for elem in _iter_record_elements(src):
+        batch.append(etree.tostring(elem))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_field(record: MarcRecord, tag: str) -> Optional[DataField]:
+    fields = record.get(tag)
+    return fields[0] if fields else None
+
+
+def get_subfield(field: Optional[DataField], subfield_code: str) -> Optional[str]:
+    values = field[2].get(subfield_code) if field else None
+    return values[0] if values else None
+
+
+def _unbracket(value: str) -> str:
+    # Same result as re.sub(r"\[(.*?)\]", r"\1", value): every "[" is paired
+    # with the next "]" on the same line and both brackets are dropped
+    parts = []
+    start = 0
+    lb = value.find("[")
+    while lb != -1:
+        rb = value.find("]", lb + 1)
+        if rb == -1:
+            break
+        if value.find("\n", lb, rb) != -1:
+            lb = value.find("[", lb + 1)
+            continue
+        parts.append(value[start:lb])
+        parts.append(value[lb + 1 : rb])
+        start = rb + 1
+        lb = value.find("[", start)
+    parts.append(value[start:])
+    return "".join(parts)
+
+
+def _clean(value: str) -> str:
+    # Extract content inside square brackets, most values have none
+    if "[" in value:
+        value = _unbracket(value)
+    # Collapse whitespace runs into single spaces and strip the ends, then
+    # strip any remaining unwanted characters
+    return " ".join(value.split()).strip(STRIP_CHARS)
+
+
+def get_stripped_subfield(field: Optional[DataField], subfield_code: str) -> str:
+    # Called for nearly every subfield, so get_subfield is inlined here
+    if field:
+        values = field[2].get(subfield_code)
+        if values and values[0]:
+            return _clean(values[0])
     return ""
 
 
-# Function to strip and clean multiple subfields
-def get_stripped_subfields(field: "Field", subfield_code: str) -> List[str]:
-    values = field.get_subfields(subfield_code)
-    cleaned_values = []
-    if len(values) > 0:
-        for value in values:
-            cleaned_value = value.strip()
-            # Extract content inside square brackets and replace brackets with spaces
-            cleaned_value = SQUARE_BRACKETS_REGEX.sub(r"\1", cleaned_value)
-            # Replace multiple spaces with a single space
-            cleaned_value = WHITESPACE_REGEX.sub(" ", cleaned_value)
-            # Strip any remaining unwanted characters
-            cleaned_values.append(cleaned_value.strip().strip(";:,./[] "))
-    return cleaned_values
+def _is_digital(record: MarcRecord, fixed_field_value: str) -> bool:
+    # Form of item (Field 008 - character position 23), q and s are electronic
+    if len(fixed_field_value) > 23 and fixed_field_value[23] in ("q", "s"):
+        return True
+    # ISBN qualifier (Field 020 - subfield q) naming an e-book format
+    isbn_type = get_subfield(get_field(record, "020"), "q")
+    if isbn_type:
+        isbn_type = isbn_type.lower()
+        return "pdf" in isbn_type or "epub" in isbn_type
+    return False
+
+
+def _record_to_readable(
+    record: MarcRecord, skip_digital: bool = False
+) -> Optional[ReadableRecord]:
+    fixed_fields = record.get("008")
+    fixed_field_value = fixed_fields[0] if fixed_fields else ""
+    # Bail out before any extraction work for skipped records
+    if skip_digital and _is_digital(record, fixed_field_value):
+        return None
+
+    result = ReadableRecord(ester_id=record["001"][0])
+
+    # Extract Title (Field 245 - subfields a, b, and n)
+    title_field = get_field(record, "245")
+    if title_field:
+        result.title = get_stripped_subfield(title_field, "a")
+        result.subtitle = get_stripped_subfield(title_field, "b")
+        if logger.isEnabledFor(logging.DEBUG) and "b14256381" in result.ester_id:
+            logger.debug("The subtitle is %s", result.subtitle)
+        subfields = title_field[2]
+        result.part_number = ", ".join(_clean(v) for v in subfields.get("n", ()))
+        result.part_name = ", ".join(_clean(v) for v in subfields.get("p", ()))
+
+    edition_field = get_field(record, "250")
+    if edition_field:
+        result.edition = get_stripped_subfield(edition_field, "a")
+
+    # Extract Authors (Fields 100 and 700 - subfield a)
+    author = get_stripped_subfield(get_field(record, "100"), "a")
+    if author:
+        author = reverse_name(author)
+        result.authors.append(author)
+
+    pub_field = get_field(record, "260")
+    if pub_field:
+        # Extract Publisher (Field 260 - subfield b)
+        result.publisher = get_stripped_subfield(pub_field, "b")
+
+        # Extract Year Published (Field 260 - subfield c)
+        year_published_subfield = get_stripped_subfield(pub_field, "c")
+        if year_published_subfield:
+            year_published = YEAR_REGEX.search(year_published_subfield)
+            result.year_published = (
+                int(year_published.group()) if year_published else None
+            )
+
+        # Extract City Published (Field 260 - subfield a)
+        result.city_published = get_stripped_subfield(pub_field, "a")
+
+    # Extract ISBN (Field 020 - subfield a)
+    isbn_field = get_field(record, "020")
+
+    if isbn_field:
+        isbn_type = get_subfield(isbn_field, "q")
+        if isbn_type:
+            if "pdf" not in isbn_type.lower():
+                result.isbn = get_stripped_subfield(isbn_field, "a")
+        else:
+            result.isbn = get_stripped_subfield(isbn_field, "a")
+
+    # Extract Series Information (Field 490 - subfields a, v)
+    series_field = get_field(record, "490")
+    if series_field:
+        result.series = get_stripped_subfield(series_field, "a")
+        result.series_number = get_stripped_subfield(series_field, "v")
+
+    physical_description_field = get_field(record, "300")
+    if physical_description_field:
+        # Extract Number of Pages (Field 300 - subfield a)
+        num_pages_subfield = get_stripped_subfield(physical_description_field, "a")
+        if num_pages_subfield:
+            num_pages = NUMBER_REGEX.match(num_pages_subfield)
+            result.num_pages = int(num_pages.group()) if num_pages else None
+
+        # Extract Dimensions (Field 300 - subfield c)
+        result.dimensions = get_stripped_subfield(physical_description_field, "c")
+
+    if fixed_field_value:
+        # Extract Language (Field 008 - character positions 35-37)
+        result.language = fixed_field_value[35:38]
+
+    # Extract Original Language (Field 041 - subfield h)
+    original_language_field = get_field(record, "041")
+    if original_language_field:
+        result.original_language = get_stripped_subfield(original_language_field, "h")
+
+    # Extract Genres (Field 655 - subfield a)
+    for field in record.get("655", ()):
+        genre = get_stripped_subfield(field, "a")
+        if genre:
+            result.genres.append(genre)
+
+    # Extract specific roles (Field 700)
+    author_set = set(result.authors)
+    for field in record.get("700", ()):
+        name = get_stripped_subfield(field, "a")
+        if not name:
+            continue
+        role = get_stripped_subfield(field, "e") or get_stripped_subfield(field, "4")
+        if not role:
+            continue
+        # Relator terms are nearly always lowercase already, so only fall back
+        # to lowercasing when the exact lookup misses
+        attr = ROLE_TO_ATTR.get(role) or ROLE_TO_ATTR.get(role.lower())
+        if attr is None:
+            continue
+        name = reverse_name(name)
+        if attr == "authors":
+            if name not in author_set:
+                author_set.add(name)
+                result.authors.append(name)
+        else:
+            getattr(result, attr).append(name)
+
+    return result
+
+
+def _parse_batch(batch: List[bytes], skip_digital: bool) -> List[ReadableRecord]:
+    results = []
+    for blob in batch:
+        result = _record_to_readable(
+            _parse_record(etree.fromstring(blob)), skip_digital
+        )
+        if result is not None:
+            results.append(result)
+    return results
 
 
 def marcxml_to_readable(
     src: Union[str, os.PathLike, IO[bytes]],
     skip_digital: bool = False,
+    max_workers: Optional[int] = 1,
+    batch_size: int = 1000,
 ) -> List[ReadableRecord]:
-    # Parse MARCXML records
-    records: List[Record] = pymarc.marcxml.parse_xml_to_array(src)
-    results = []
-
-    for record in records:
-        ester_id = record.get("001").value()
-        if skip_digital:
-            fixed_field_value = record.get("008").value()
-            if fixed_field_value[23] == "q" or fixed_field_value[23] == "s":
-                continue
-
-        result = ReadableRecord(ester_id=ester_id)
-
-        # Extract Title (Field 245 - subfields a, b, and n)
-        title_field = record.get("245")
-        if title_field:
-            result.title = get_stripped_subfield(title_field, "a")
-            result.subtitle = get_stripped_subfield(title_field, "b")
-            if "b14256381" in result.ester_id:
-                print(f"The subtitle is {result.subtitle}")
-            part_numbers = get_stripped_subfields(title_field, "n")
-            if part_numbers:
-                result.part_number = ", ".join(part_numbers)
-
-            part_names = get_stripped_subfields(title_field, "p")
-            if part_names:
-                result.part_name = ", ".join(part_names)
-
-        edition_field = record.get("250")
-        if edition_field:
-            result.edition = get_stripped_subfield(edition_field, "a")
-
-        # Extract Authors (Fields 100 and 700 - subfield a)
-        author = get_stripped_subfield(record.get("100", {}), "a")
-        if author:
-            author = reverse_name(author)
-            result.authors.append(author)
-
-        pub_field = record.get("260")
-        if pub_field:
-            # Extract Publisher (Field 260 - subfield b)
-            result.publisher = get_stripped_subfield(pub_field, "b")
-
-            # Extract Year Published (Field 260 - subfield c)
-            year_published_subfield = get_stripped_subfield(pub_field, "c")
-            if year_published_subfield:
-                year_published = re.search(YEAR_REGEX, year_published_subfield)
-                result.year_published = (
-                    int(year_published.group()) if year_published else None
-                )
-
-            # Extract City Published (Field 260 - subfield a)
-            result.city_published = get_stripped_subfield(pub_field, "a")
+    """Convert the MARCXML records in ``src`` to ``ReadableRecord`` objects.
 
-        # Extract ISBN (Field 020 - subfield a)
-        isbn_field = record.get("020")
+    Records are converted in the calling process by default. Passing
+    ``max_workers`` > 1 (or ``None`` for ``os.cpu_count()``) converts batches of
+    ``batch_size`` records in a process pool instead. On platforms that start
+    worker processes with "spawn" (Windows, macOS) the calling script must then
+    guard its entry point with ``if __name__ == "__main__":``.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
 
-        if isbn_field:
-            isbn_type = isbn_field.get("q")
-            if isbn_type:
-                if "pdf" not in isbn_type.lower():
-                    result.isbn = get_stripped_subfield(isbn_field, "a")
-            else:
-                result.isbn = get_stripped_subfield(isbn_field, "a")
-
-        # Extract Series Information (Field 490 - subfields a, v)
-        series_field = record.get("490")
-        if series_field:
-            result.series = get_stripped_subfield(series_field, "a")
-            result.series_number = get_stripped_subfield(series_field, "v")
-
-        physical_description_field = record.get("300")
-        if physical_description_field:
-            # Extract Number of Pages (Field 300 - subfield a)
-            num_pages_subfield = get_stripped_subfield(physical_description_field, "a")
-            if num_pages_subfield:
-                num_pages = re.match(NUMBER_REGEX, num_pages_subfield)
-                result.num_pages = int(num_pages.group()) if num_pages else None
-
-            # Extract Dimensions (Field 300 - subfield c)
-            result.dimensions = get_stripped_subfield(physical_description_field, "c")
-
-        lang_field = record.get("008")
-        if lang_field:
-            # Extract Language (Field 008 - character positions 35-37)
-            result.language = lang_field.value()[35:38]
-
-        # Extract Original Language (Field 041 - subfield h)
-        original_language_field = record.get("041")
-        if original_language_field:
-            result.original_language = get_stripped_subfield(
-                original_language_field, "h"
-            )
-
-        # Extract Genres (Field 655 - subfield a)
-        for field in record.get_fields("655"):
-            genre = get_stripped_subfield(field, "a")
-            if genre:
-                result.genres.append(genre)
+    results = []
 
-        # Extract specific roles (Field 700)
-        for field in record.get_fields("700"):
-            role = get_stripped_subfield(field, "e") or get_stripped_subfield(
-                field, "4"
-            )
-            name = get_stripped_subfield(field, "a")
-            if role and name:
-                name = reverse_name(name)
-                role = role.lower()
-                if "autor" == role and name not in result.authors:
-                    result.authors.append(name)
-                if "toimetaja" == role:
-                    result.editors.append(name)
-                elif "väljaandja" == role:
-                    result.publishers.append(name)
-                elif "koostaja" == role:
-                    result.compilers.append(name)
-                elif "illustreerija" == role:
-                    result.illustrators.append(name)
-                elif "tõlkija" == role:
-                    result.translators.append(name)
-                elif "kujundaja" == role:
-                    result.designers.append(name)
-                elif "fotograaf" == role:
-                    result.photographers.append(name)
-
-        results.append(result)
+    if max_workers == 1:
+        for record in iter_marc_records(src):
+            result = _record_to_readable(record, skip_digital)
+            if result is not None:
+                results.append(result)
+        return results
+
+    # Records are independent, so batches of serialized <record> elements are
+    # converted in worker processes. Only a few batches are kept in flight to
+    # preserve the streaming parser's bounded memory use, and results are
+    # collected in submission order to keep the input order.
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending: Deque["Future[List[ReadableRecord]]"] = deque()
+        for batch in _iter_record_batches(src, batch_size):
+            pending.append(executor.submit(_parse_batch, batch, skip_digital))
+            if len(pending) >= 2 * max_workers:
+                results.extend(pending.popleft().result())
+        while pending:
+            results.extend(pending.popleft().result())
 
     return results
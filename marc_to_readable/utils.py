@@ -8,6 +8,10 @@ import py7zr
 import requests
 
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+EXTRACT_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+
 def download_file(
     url: str,
     folder: Union[os.PathLike, str],
@@ -17,20 +21,32 @@ def download_file(
     download_path = Path(folder)
     download_path.mkdir(parents=True, exist_ok=True)
 
-    response = requests.get(url, **requests_kwargs)
-    response.raise_for_status()
-    if filename is None:
-        content_disposition = response.headers.get("content-disposition")
-        if content_disposition is None:
-            raise ValueError(
-                "Unable to determine filename because no Content-Disposition header was found for the request performed on the URL. Please provide the download_filename argument."
-            )
-        filename = content_disposition.split("=", -1)[-1]
+    # Override rather than pass stream=True, so callers passing stream= still work
+    requests_kwargs["stream"] = True
+    with requests.get(url, **requests_kwargs) as response:
+        response.raise_for_status()
+        if filename is None:
+            content_disposition = response.headers.get("content-disposition")
+            if content_disposition is None:
+                raise ValueError(
+                    "Unable to determine filename because no Content-Disposition header was found for the request performed on the URL. Please provide the download_filename argument."
+                )
+            filename = content_disposition.split("=", -1)[-1]
 
-    download_path = download_path / filename
+        download_path = download_path / filename
 
-    with open(download_path, "wb") as f:
-        f.write(response.content)
+        # Write the body in chunks instead of holding the whole archive in
+        # memory. The chunks go to a temporary sibling that only replaces
+        # download_path once complete, so a failed transfer leaves no truncated file
+        part_path = download_path.with_suffix(download_path.suffix + ".part")
+        try:
+            with open(part_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(part_path, download_path)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
     return download_path
 
 
@@ -43,22 +59,33 @@ def extract_archive(
 
     if archive_path.suffix == ".zip":
         with zipfile.ZipFile(archive_path, "r") as archive:
+            names = archive.namelist()
             archive.extractall(extract_to)
-            return extract_to / archive.namelist()[0]
+            return extract_to / names[0]
     elif archive_path.suffix in {".tar", ".tar.gz", ".tgz"}:
-        with tarfile.open(archive_path, "r:*") as archive:
-            archive.extractall(extract_to)
-            return extract_to / archive.getnames()[0]
+        # Copy members with a larger buffer than tarfile's 16 KiB default.
+        # copybufsize is forwarded to TarFile but missing from the open() stubs
+        with tarfile.open(  # type: ignore[call-overload]
+            archive_path, "r:*", copybufsize=EXTRACT_BUFFER_SIZE
+        ) as archive:
+            members = archive.getmembers()
+            if hasattr(tarfile, "data_filter"):
+                archive.extractall(extract_to, members=members, filter="data")
+            else:
+                archive.extractall(extract_to, members=members)
+            return extract_to / members[0].name
     elif archive_path.suffix == ".7z":
         with py7zr.SevenZipFile(archive_path, "r") as archive:
+            names = archive.getnames()
             archive.extractall(path=extract_to)
-            return extract_to / archive.getnames()[0]
+            return extract_to / names[0]
     else:
         raise ValueError(f"Unsupported archive format: {archive_path.suffix}")
 
 
 def reverse_name(name: str) -> str:
-    parts = name.split(", ")
-    if len(parts) == 2:
-        return f"{parts[1]} {parts[0]}"
+    last, sep, first = name.partition(", ")
+    # Only reverse names with exactly one ", " separator
+    if sep and ", " not in first:
+        return f"{first} {last}"
     return name
\ No newline at end of file
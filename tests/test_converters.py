@@ -0,0 +1,173 @@
+import io
+import unittest
+from dataclasses import asdict
+
+from marc_to_readable.converters import marcxml_to_readable
+
+
+# Field 008 with form of item (position 23) and language (positions 35-37)
+PRINT_008 = "x" * 23 + "r" + "x" * 11 + "est" + "xx"
+DIGITAL_008 = "x" * 23 + "q" + "x" * 11 + "est" + "xx"
+
+MARCXML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<collection xmlns="http://www.loc.gov/MARC21/slim">
+  <record>
+    <leader>00000nam a2200000 a 4500</leader>
+    <controlfield tag="001">b0000001</controlfield>
+    <controlfield tag="008">{PRINT_008}</controlfield>
+    <datafield tag="020" ind1=" " ind2=" ">
+      <subfield code="a">9789985000001 :</subfield>
+      <subfield code="q">köide</subfield>
+    </datafield>
+    <datafield tag="100" ind1="1" ind2=" ">
+      <subfield code="a">Tamm, Jaan,</subfield>
+    </datafield>
+    <datafield tag="245" ind1="1" ind2="0">
+      <subfield code="a">Raamat  [pealkiri] :</subfield>
+      <subfield code="b">alapealkiri /</subfield>
+      <subfield code="n">1.</subfield>
+      <subfield code="n">[2]</subfield>
+      <subfield code="p">Esimene osa ;</subfield>
+      <subfield code="p">Teine osa</subfield>
+    </datafield>
+    <datafield tag="260" ind1=" " ind2=" ">
+      <subfield code="a">[Tallinn] :</subfield>
+      <subfield code="b">Eesti Raamat,</subfield>
+      <subfield code="c">c2005.</subfield>
+    </datafield>
+    <datafield tag="300" ind1=" " ind2=" ">
+      <subfield code="a">245 lk. ;</subfield>
+      <subfield code="c">24 cm</subfield>
+    </datafield>
+    <datafield tag="700" ind1="1" ind2=" ">
+      <subfield code="a">Tamm, Jaan,</subfield>
+      <subfield code="e">autor</subfield>
+    </datafield>
+    <datafield tag="700" ind1="1" ind2=" ">
+      <subfield code="a">Kask, Mari,</subfield>
+      <subfield code="e">Autor</subfield>
+    </datafield>
+    <datafield tag="700" ind1="1" ind2=" ">
+      <subfield code="a">Kask, Mari,</subfield>
+      <subfield code="e">autor</subfield>
+    </datafield>
+    <datafield tag="700" ind1="1" ind2=" ">
+      <subfield code="a">Mets, Peeter,</subfield>
+      <subfield code="e">toimetaja</subfield>
+    </datafield>
+    <datafield tag="700" ind1="1" ind2=" ">
+      <subfield code="a">Saar, Anna,</subfield>
+      <subfield code="4">Tõlkija</subfield>
+    </datafield>
+    <datafield tag="700" ind1="1" ind2=" ">
+      <subfield code="a">Org, Ülo,</subfield>
+      <subfield code="e">muu</subfield>
+    </datafield>
+    <datafield tag="700" ind1="1" ind2=" ">
+      <subfield code="a">Laas, Tiit,</subfield>
+    </datafield>
+  </record>
+  <record>
+    <controlfield tag="001">b0000002</controlfield>
+    <controlfield tag="008">{DIGITAL_008}</controlfield>
+    <datafield tag="245" ind1="1" ind2="0">
+      <subfield code="a">Digitaalne raamat</subfield>
+    </datafield>
+  </record>
+  <record>
+    <controlfield tag="001">b0000003</controlfield>
+    <controlfield tag="008">{PRINT_008}</controlfield>
+    <datafield tag="020" ind1=" " ind2=" ">
+      <subfield code="a">9789985000003</subfield>
+      <subfield code="q">PDF</subfield>
+    </datafield>
+    <datafield tag="245" ind1="1" ind2="0">
+      <subfield code="a">E-raamat</subfield>
+    </datafield>
+  </record>
+  <record>
+    <controlfield tag="001">b0000004</controlfield>
+    <controlfield tag="008">lühike</controlfield>
+    <datafield tag="245" ind1="1" ind2="0">
+      <subfield code="a">Lühikese 008-ga</subfield>
+    </datafield>
+  </record>
+  <record>
+    <controlfield tag="001">b0000005</controlfield>
+    <controlfield tag="008">{PRINT_008}</controlfield>
+    <datafield tag="020" ind1=" " ind2=" ">
+      <subfield code="a">9789985000005</subfield>
+      <subfield code="q">EPUB</subfield>
+    </datafield>
+    <datafield tag="245" ind1="1" ind2="0">
+      <subfield code="a">E-raamat EPUB-vormingus</subfield>
+    </datafield>
+  </record>
+</collection>
+""".encode()
+
+
+def convert(marcxml: bytes = MARCXML, **kwargs):
+    return marcxml_to_readable(io.BytesIO(marcxml), **kwargs)
+
+
+class MarcxmlToReadableTest(unittest.TestCase):
+    def test_converts_every_record(self):
+        records = convert()
+        self.assertEqual(
+            [r.ester_id for r in records],
+            ["b0000001", "b0000002", "b0000003", "b0000004", "b0000005"],
+        )
+
+    def test_extracts_fields(self):
+        record = convert()[0]
+        self.assertEqual(record.title, "Raamat pealkiri")
+        self.assertEqual(record.subtitle, "alapealkiri")
+        self.assertEqual(record.part_number, "1, 2")
+        self.assertEqual(record.part_name, "Esimene osa, Teine osa")
+        self.assertEqual(record.city_published, "Tallinn")
+        self.assertEqual(record.publisher, "Eesti Raamat")
+        self.assertEqual(record.year_published, 2005)
+        self.assertEqual(record.num_pages, 245)
+        self.assertEqual(record.dimensions, "24 cm")
+        self.assertEqual(record.isbn, "9789985000001")
+        self.assertEqual(record.language, "est")
+
+    def test_pdf_isbn_is_not_extracted(self):
+        self.assertEqual(convert()[2].isbn, "")
+
+    def test_epub_isbn_is_extracted(self):
+        self.assertEqual(convert()[4].isbn, "9789985000005")
+
+    def test_dispatches_700_roles(self):
+        record = convert()[0]
+        self.assertEqual(record.authors, ["Jaan Tamm", "Mari Kask"])
+        self.assertEqual(record.editors, ["Peeter Mets"])
+        self.assertEqual(record.translators, ["Anna Saar"])
+        for attr in ("publishers", "compilers", "illustrators", "designers"):
+            self.assertEqual(getattr(record, attr), [])
+
+    def test_short_008(self):
+        record = convert()[3]
+        self.assertEqual(record.language, "")
+
+    def test_skip_digital(self):
+        # b0000002 by 008/23, b0000003 and b0000005 by their 020$q PDF/EPUB
+        records = convert(skip_digital=True)
+        self.assertEqual([r.ester_id for r in records], ["b0000001", "b0000004"])
+
+    def test_unnamespaced_marcxml(self):
+        marcxml = MARCXML.replace(b' xmlns="http://www.loc.gov/MARC21/slim"', b"", 1)
+        self.assertEqual(
+            [asdict(r) for r in convert(marcxml)], [asdict(r) for r in convert()]
+        )
+
+    def test_process_pool_matches_serial(self):
+        for skip_digital in (False, True):
+            serial = convert(skip_digital=skip_digital)
+            parallel = convert(skip_digital=skip_digital, max_workers=2, batch_size=1)
+            self.assertEqual([asdict(r) for r in parallel], [asdict(r) for r in serial])
+
+
+if __name__ == "__main__":
+    unittest.main()
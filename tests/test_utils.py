@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from marc_to_readable.utils import download_file
+
+
+class FakeResponse:
+    def __init__(self, chunks, headers=None, error=None):
+        self.chunks = chunks
+        self.headers = headers or {}
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        yield from self.chunks
+        if self.error is not None:
+            raise self.error
+
+
+class DownloadFileTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.folder = Path(tmp.name)
+
+    def download(self, response, **kwargs):
+        with mock.patch("requests.get", return_value=response) as get:
+            path = download_file("https://example.com/file", self.folder, **kwargs)
+        return path, get
+
+    def test_writes_streamed_content(self):
+        response = FakeResponse([b"abc", b"def"])
+        path, get = self.download(response, filename="data.zip", stream=False)
+        self.assertEqual(path, self.folder / "data.zip")
+        self.assertEqual(path.read_bytes(), b"abcdef")
+        self.assertTrue(get.call_args.kwargs["stream"])
+
+    def test_filename_from_content_disposition(self):
+        response = FakeResponse(
+            [b"abc"],
+            headers={"content-disposition": "attachment; filename=records.zip"},
+        )
+        path, _ = self.download(response)
+        self.assertEqual(path, self.folder / "records.zip")
+        self.assertEqual(path.read_bytes(), b"abc")
+
+    def test_no_partial_file_on_error(self):
+        response = FakeResponse(
+            [b"abc"], error=requests.exceptions.ChunkedEncodingError()
+        )
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self.download(response, filename="data.zip")
+        self.assertEqual(list(self.folder.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()